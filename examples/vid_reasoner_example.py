@@ -14,83 +14,164 @@ Prerequisites:
 2. Start the server: python run.py
 
 3. Run this example: python examples/vid_reasoner_example.py
+
+   Add --iterations/--concurrency to repeat the examples as a small load test
+   and print latency percentiles, e.g. --iterations 20 --concurrency 5.
 """
 
-import requests
+import argparse
+import asyncio
 import json
 import os
+import statistics
+import time
+
+import httpx
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-
-def call_vid_reasoner(
-    input_value, output_type="text", input_type="text", base_url="http://localhost:8080"
-):
+# Example inputs: (title, input_value, extra endpoint options)
+EXAMPLES = [
+    ("1. Basic usage with 'hello world!'", "hello world!", {}),
+    (
+        "2. Processing a different input",
+        "Analyze this video content for key insights",
+        {},
+    ),
+    (
+        "3. With explicit output and input type specifications",
+        "Process this video data",
+        {"output_type": "text", "input_type": "text"},
+    ),
+]
+
+
+async def call_vid_reasoner(client, input_value, output_type="text", input_type="text"):
     """
     Call the vid-reasoner endpoint.
 
     Args:
+        client (httpx.AsyncClient): Client bound to the API server's base URL;
+            sharing it lets concurrent calls reuse pooled connections
         input_value (str): The input value to process
         output_type (str): Expected output format (default: "text")
         input_type (str): Input format (default: "text")
-        base_url (str): Base URL of the API server
 
     Returns:
         dict: The response from the endpoint
     """
 
-    url = f"{base_url}/vid-reasoner"
-
     payload = {
         "input_value": input_value,
         "output_type": output_type,
         "input_type": input_type,
     }
 
-    headers = {
-        "Content-Type": "application/json",
-        "x-api-key": os.getenv("ARCHON_API_KEY", "test-key"),
-    }
-
     try:
-        response = requests.post(url, json=payload, headers=headers)
+        response = await client.post("/vid-reasoner", json=payload)
         response.raise_for_status()
         return response.json()
-    except requests.exceptions.RequestException as e:
+    # ValueError covers a non-JSON body, e.g. an HTML page at a wrong --server
+    except (httpx.HTTPError, ValueError) as e:
         print(f"Error calling vid-reasoner endpoint: {e}")
         return None
 
 
-def main():
+async def timed_call(client, semaphore, samples, input_value, **options):
+    """Call the endpoint once ``semaphore`` allows.
+
+    The latency in seconds is recorded only for successful calls, so failures
+    do not skew the percentiles.
+    """
+    async with semaphore:
+        start = time.perf_counter()
+        result = await call_vid_reasoner(client, input_value, **options)
+        if result is not None:
+            samples.append(time.perf_counter() - start)
+        return result
+
+
+def print_latency_summary(samples, failures):
+    """Print request counts and p50/p95/p99 latency of the successful requests."""
+    print(f"\n⏱️  {len(samples)} succeeded, {failures} failed")
+    if len(samples) < 2:
+        return
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    p50, p95, p99 = (cuts[p - 1] * 1000 for p in (50, 95, 99))
+    print(f"   p50 {p50:.0f} ms, p95 {p95:.0f} ms, p99 {p99:.0f} ms")
+
+
+async def main(
+    base_url="http://localhost:8080", iterations=1, concurrency=len(EXAMPLES)
+):
     """Main function demonstrating vid-reasoner usage."""
 
     print("🎥 Vid-Reasoner Endpoint Example")
     print("=" * 50)
 
-    # Example 1: Basic usage
-    print("\n1. Basic usage with 'hello world!'")
-    result = call_vid_reasoner("hello world!")
-    if result:
-        print(f"Response: {json.dumps(result, indent=2)}")
-
-    # Example 2: Different input
-    print("\n2. Processing a different input")
-    result = call_vid_reasoner("Analyze this video content for key insights")
-    if result:
-        print(f"Response: {json.dumps(result, indent=2)}")
-
-    # Example 3: With explicit type specifications
-    print("\n3. With explicit output and input type specifications")
-    result = call_vid_reasoner(
-        "Process this video data", output_type="text", input_type="text"
-    )
-    if result:
-        print(f"Response: {json.dumps(result, indent=2)}")
+    headers = {"x-api-key": os.getenv("ARCHON_API_KEY", "test-key")}
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+    # LangFlow calls take seconds, so allow well beyond httpx's 5s default
+    async with httpx.AsyncClient(
+        base_url=base_url, headers=headers, timeout=120
+    ) as client:
+        # The examples are independent, so send them concurrently
+        results = await asyncio.gather(
+            *(
+                timed_call(client, semaphore, samples, input_value, **options)
+                for _ in range(iterations)
+                for _, input_value, options in EXAMPLES
+            )
+        )
+
+    # Every iteration sends the same inputs; show the first round's answers
+    for (title, _, _), result in zip(EXAMPLES, results):
+        print(f"\n{title}")
+        if result:
+            print(f"Response: {json.dumps(result, indent=2)}")
+
+    if iterations > 1:
+        print_latency_summary(samples, failures=results.count(None))
 
     print("\n✅ Vid-reasoner endpoint examples completed!")
 
 
+def positive_int(value):
+    """argparse type for options that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value!r}")
+    return number
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Call the vid-reasoner endpoint")
+    parser.add_argument(
+        "--server",
+        default="http://localhost:8080",
+        help="Base URL of Archon Content Server (default: http://localhost:8080)",
+    )
+    parser.add_argument(
+        "--iterations",
+        type=positive_int,
+        default=1,
+        help="How many times to send the example inputs (default: 1)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=positive_int,
+        default=len(EXAMPLES),
+        help=f"Maximum requests in flight (default: {len(EXAMPLES)})",
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    asyncio.run(main(args.server, args.iterations, args.concurrency))
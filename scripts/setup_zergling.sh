@@ -69,18 +69,54 @@ docker build -t zergling:latest .
 docker stop zergling_test 2>/dev/null || true
 docker rm zergling_test 2>/dev/null || true
 
-# Run new container
-docker run -d --rm \
+# Run new container. On Linux, host networking skips the docker-proxy hop;
+# elsewhere (Docker Desktop) the port has to be published. --init forwards
+# signals so `docker stop` does not wait out the 10s grace period.
+if [ "$(uname -s)" = "Linux" ]; then
+  NETWORK_ARGS=(--network=host)
+else
+  NETWORK_ARGS=(-p 8080:8080)
+fi
+
+docker run -d --rm --init \
   --env-file .env \
   -v "$(pwd)/$CRED_PATH:/app/$CRED_PATH" \
-  -p 8080:8080 \
+  "${NETWORK_ARGS[@]}" \
   --name zergling_test \
   zergling:latest
 
 # 8. Wait for FastAPI to be ready
 echo -e "\n== Waiting for FastAPI to start =="
-for i in {1..30}; do
-  if curl -s http://localhost:8080/health | grep -q '"status"'; then
+
+# Follow the container log so startup is noticed as soon as uvicorn reports it.
+# `docker logs -f` exits when the container stops, so a crash fails fast
+# instead of waiting out the deadline.
+log_deadline=$((SECONDS + 20))
+LOG_FILE=$(mktemp)
+docker logs -f zergling_test > "$LOG_FILE" 2>&1 &
+LOGS_PID=$!
+while kill -0 "$LOGS_PID" 2>/dev/null && [ "$SECONDS" -lt "$log_deadline" ]; do
+  if grep -q -E "Application startup complete|Uvicorn running" "$LOG_FILE"; then
+    break
+  fi
+  sleep 0.05
+done
+if ! kill -0 "$LOGS_PID" 2>/dev/null; then
+  echo -e "\n❌ ERROR: FastAPI container exited during startup."
+  cat "$LOG_FILE"
+  rm -f "$LOG_FILE"
+  exit 1
+fi
+kill "$LOGS_PID" 2>/dev/null || true
+rm -f "$LOG_FILE"
+
+# Confirm over HTTP; this is also the fallback if the log never matched, so it
+# gets its own 10s budget rather than whatever the log wait left over.
+# Poll with short per-request timeouts and backoff (50ms, x1.5, capped at 500ms).
+deadline=$((SECONDS + 10))
+delay=0.05
+while [ "$SECONDS" -lt "$deadline" ]; do
+  if curl -s --connect-timeout 0.3 --max-time 0.5 http://localhost:8080/health | grep -q '"status"'; then
     echo -e "\n✅ Zergling FastAPI is up and running!"
     echo "📝 API Documentation: http://localhost:8080/docs"
     echo "🔍 Health Check: http://localhost:8080/health"
@@ -89,7 +125,8 @@ for i in {1..30}; do
     exit 0
   fi
   echo -n "."
-  sleep 1
+  sleep "$delay"
+  delay=$(awk -v d="$delay" 'BEGIN { d *= 1.5; print (d > 0.5 ? 0.5 : d) }')
 done
 
 echo -e "\n❌ ERROR: FastAPI did not become ready in time."
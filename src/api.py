@@ -12,15 +12,23 @@ Environment Variables Required:
 - OPENAI_API_KEY: OpenAI API key for LLM plan generation (optional)
 """
 
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 from tempfile import mkdtemp
 from typing import Any
 
 import httpx
 import logging
-from fastapi import FastAPI, HTTPException, Depends, Header
-from fastapi.responses import FileResponse, StreamingResponse
+import orjson
+from fastapi import FastAPI, HTTPException, Depends, Header, Request
+from fastapi.responses import (
+    FileResponse,
+    JSONResponse,
+    ORJSONResponse,
+    StreamingResponse,
+)
 from pydantic import BaseModel, Field
 
 from src.config import get_setting
@@ -30,10 +38,24 @@ from src.spreadsheet_builder import PlanGenerator, build_from_plan
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open one pooled HTTP client for outbound LangFlow calls; close it on shutdown."""
+    app.state.http_client = httpx.AsyncClient(timeout=30)
+    try:
+        yield
+    finally:
+        await app.state.http_client.aclose()
+
+
 app = FastAPI(
     title="Archon Content Server",
     version="1.0.0",
     description="API for LangFlow research integration and spreadsheet generation. All endpoints require authentication via X-API-Key header.",
+    # orjson serialises responses ~2x faster than the stdlib-backed JSONResponse
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # ============================================================================
@@ -68,6 +90,16 @@ async def verify_api_key(x_api_key: str = Header(..., alias="X-API-Key")) -> str
     return x_api_key
 
 
+def get_http_client(request: Request) -> httpx.AsyncClient:
+    """
+    Return the app-wide HTTP client opened in ``lifespan``.
+
+    Reusing it keeps LangFlow connections alive across requests instead of
+    paying a new TCP/TLS handshake per call.
+    """
+    return request.app.state.http_client
+
+
 # ============================================================================
 # REQUEST/RESPONSE MODELS
 # ============================================================================
@@ -149,6 +181,21 @@ class ErrorResponse(BaseModel):
     detail: str = Field(..., description="Error details")
 
 
+class PydanticResponse(JSONResponse):
+    """
+    JSON response rendered straight from a Pydantic model.
+
+    Returning a Response skips FastAPI's re-validation against ``response_model``,
+    which is then only used for the OpenAPI schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if not isinstance(content, BaseModel):
+            return super().render(content)
+        # Call the compiled serializer directly: no kwarg handling, no str->bytes copy
+        return content.__pydantic_serializer__.to_json(content)
+
+
 # ============================================================================
 # CORE ENDPOINTS
 # ============================================================================
@@ -160,17 +207,20 @@ class ErrorResponse(BaseModel):
     summary="Health Check",
     description="Check if the service is running and healthy.",
 )
-def health_check():
+def health_check() -> PydanticResponse:
     """
     Health check endpoint.
 
     Returns:
-        HealthResponse: Service status and timestamp
+        PydanticResponse: Serialized HealthResponse with service status and timestamp
     """
-    return HealthResponse(
-        status="healthy",
-        timestamp=datetime.now(timezone.utc).isoformat(),
-        version="1.0.0",
+    # Values are built here, so skip validation on the way in and on the way out
+    return PydanticResponse(
+        HealthResponse.model_construct(
+            status="healthy",
+            timestamp=datetime.now(timezone.utc).isoformat(),
+            version="1.0.0",
+        )
     )
 
 
@@ -201,16 +251,19 @@ def health_check():
     """,
 )
 async def research(
-    body: ResearchRequest, api_key: str = Depends(verify_api_key)
-) -> ResearchResponse:
+    body: ResearchRequest,
+    api_key: str = Depends(verify_api_key),
+    client: httpx.AsyncClient = Depends(get_http_client),
+) -> PydanticResponse:
     """
     Execute a LangFlow research flow and return the extracted answer.
 
     Args:
         body: ResearchRequest containing query and flow_id
+        client: Shared HTTP client used to call LangFlow
 
     Returns:
-        ResearchResponse: The extracted text response from LangFlow
+        PydanticResponse: Serialized ResearchResponse with the extracted text
 
     Raises:
         HTTPException: 503 if configuration is missing, 500 for server errors
@@ -225,11 +278,13 @@ async def research(
     # Construct the full URL
     flow_url = f"{base_url.rstrip('/')}/{body.flow_id}"
 
-    payload = {
-        "input_value": body.query,
-        "output_type": "text",
-        "input_type": "text",
-    }
+    content = orjson.dumps(
+        {
+            "input_value": body.query,
+            "output_type": "text",
+            "input_type": "text",
+        }
+    )
     headers = {
         "x-api-key": api_key,
         "Content-Type": "application/json",
@@ -237,9 +292,8 @@ async def research(
 
     # 2️⃣ Perform the request
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.post(flow_url, json=payload, headers=headers)
-            resp.raise_for_status()
+        resp = await client.post(flow_url, content=content, headers=headers)
+        resp.raise_for_status()
     except httpx.HTTPStatusError as exc:
         logger.error(f"❌ HTTP error: {exc.response.status_code} - {exc.response.text}")
         raise HTTPException(
@@ -251,7 +305,7 @@ async def research(
 
     # 3️⃣ Extract the final answer from the LangFlow response structure
     try:
-        data: Any = resp.json()
+        data: Any = orjson.loads(resp.content)
 
         if isinstance(data, dict):
             # Navigate through the nested structure to find the actual text response
@@ -286,7 +340,7 @@ async def research(
     except ValueError:
         data = resp.text
 
-    return ResearchResponse(result=data)
+    return PydanticResponse(ResearchResponse.model_construct(result=data))
 
 
 @app.post(
@@ -334,16 +388,19 @@ async def research(
     },
 )
 async def vid_reasoner(
-    body: VidReasonerRequest, api_key: str = Depends(verify_api_key)
-) -> ResearchResponse | StreamingResponse:
+    body: VidReasonerRequest,
+    api_key: str = Depends(verify_api_key),
+    client: httpx.AsyncClient = Depends(get_http_client),
+) -> PydanticResponse | StreamingResponse:
     """
     Execute a LangFlow video reasoning flow and return the extracted answer.
 
     Args:
         body: VidReasonerRequest containing input_value and optional type specifications
+        client: Shared HTTP client used to call LangFlow
 
     Returns:
-        ResearchResponse | StreamingResponse: The extracted text response from LangFlow or a streaming response
+        PydanticResponse | StreamingResponse: Serialized ResearchResponse with the extracted text, or the LangFlow stream when stream=true
 
     Raises:
         HTTPException: 503 if configuration is missing, 500 for server errors
@@ -367,6 +424,8 @@ async def vid_reasoner(
     }
     if body.chat_history:
         payload["chat_history"] = body.chat_history
+    # Encode once with orjson; httpx's json= goes through the stdlib encoder
+    content = orjson.dumps(payload)
     headers = {
         "x-api-key": langflow_api_key,
         "Content-Type": "application/json",
@@ -378,13 +437,12 @@ async def vid_reasoner(
 
         async def stream_langflow():
             try:
-                async with httpx.AsyncClient(timeout=None) as client:
-                    async with client.stream(
-                        "POST", flow_url, json=payload, headers=headers
-                    ) as resp:
-                        resp.raise_for_status()
-                        async for chunk in resp.aiter_bytes():
-                            yield chunk
+                async with client.stream(
+                    "POST", flow_url, content=content, headers=headers, timeout=None
+                ) as resp:
+                    resp.raise_for_status()
+                    async for chunk in resp.aiter_bytes():
+                        yield chunk
             except httpx.HTTPStatusError as exc:
                 logger.error(
                     f"❌ HTTP error while streaming: {exc.response.status_code} - {exc.response.text}"
@@ -395,9 +453,6 @@ async def vid_reasoner(
                 logger.error(f"❌ Streaming request error: {exc}")
                 yield str(exc).encode()
 
-        # Import here to avoid circular import at top
-        from fastapi.responses import StreamingResponse
-
         return StreamingResponse(stream_langflow(), media_type="application/json")
 
     # ==============================
@@ -407,9 +462,8 @@ async def vid_reasoner(
     # 2️⃣ Perform the request
     logger.info("🚀 Making request to LangFlow...")
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.post(flow_url, json=payload, headers=headers)
-            resp.raise_for_status()
+        resp = await client.post(flow_url, content=content, headers=headers)
+        resp.raise_for_status()
     except httpx.HTTPStatusError as exc:
         logger.error(f"❌ HTTP error: {exc.response.status_code} - {exc.response.text}")
         raise HTTPException(
@@ -421,7 +475,7 @@ async def vid_reasoner(
 
     # 3️⃣ Extract the final answer from the LangFlow response structure
     try:
-        data: Any = resp.json()
+        data: Any = orjson.loads(resp.content)
 
         if isinstance(data, dict):
             # Navigate through the nested structure to find the actual text response
@@ -456,7 +510,18 @@ async def vid_reasoner(
     except ValueError:
         data = resp.text
 
-    return ResearchResponse(result=data)
+    return PydanticResponse(ResearchResponse.model_construct(result=data))
+
+
+@lru_cache(maxsize=1)
+def _plan_generator() -> PlanGenerator:
+    """Build the PlanGenerator once instead of per request.
+
+    ``PlanGenerator`` reads ``OPENAI_API_KEY`` when constructed to choose
+    between LLM and stub mode, so that choice is fixed by the first request
+    for the life of the process.
+    """
+    return PlanGenerator()
 
 
 @app.post(
@@ -500,7 +565,7 @@ async def generate_spreadsheet(
         HTTPException: 503 if OpenAI API key is missing, 500 for generation errors
     """
     # 1️⃣ Obtain plan from LLM
-    generator = PlanGenerator()
+    generator = _plan_generator()
     try:
         plan = generator.generate(body.objective, body.data or "")
     except RuntimeError as exc:  # Missing API key etc.
@@ -556,7 +621,7 @@ async def generate_plan(
     Raises:
         HTTPException: 503 if OpenAI API key is missing, 500 for generation errors
     """
-    generator = PlanGenerator()
+    generator = _plan_generator()
     try:
         plan = generator.generate(body.objective, body.data or "")
         return plan
@@ -42,6 +42,15 @@ def _sm_client() -> secretmanager.SecretManagerServiceClient:
     return secretmanager.SecretManagerServiceClient()
 
 
+@lru_cache(maxsize=None)
+def _access_secret(path: str) -> str:
+    # Cached per version path, so each secret costs one RPC per process;
+    # rotated ``latest`` values are picked up on restart. Failures raise and
+    # are therefore not cached.
+    resp = _sm_client().access_secret_version(name=path)
+    return resp.payload.data.decode("utf-8")
+
+
 # ────────────────────────────────
 # 🎛️  Public helper
 # ────────────────────────────────
@@ -86,8 +95,7 @@ def get_setting(
         sid = secret_id or name.lower().replace("_", "-")
         path = f"projects/{project_id}/secrets/{sid}/versions/{version}"
         try:
-            resp = _sm_client().access_secret_version(name=path)
-            return resp.payload.data.decode("utf-8")
+            return _access_secret(path)
         except Exception:
             pass  # fall through to default
 
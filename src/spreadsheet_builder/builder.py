@@ -3,7 +3,7 @@ from __future__ import annotations
 import re
 import warnings
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 from openpyxl import Workbook
 from openpyxl.utils import column_index_from_string, get_column_letter
@@ -55,7 +55,8 @@ _CELL_REF_RE = re.compile(r"\b([A-Z]+)(\d+)\b")
 
 
 def build_from_plan(
-    plan: Dict[str, Any], output_dir: Path = Path(".")
+    plan: Dict[str, Any],
+    output_dir: Path = Path("."),
 ) -> Path:  # noqa: D401,E501
     """Build an Excel workbook from a validated plan (v0.2).
 
@@ -82,63 +83,51 @@ def build_from_plan(
     ValueError
         Miscellaneous value problems (e.g. >2 decimals, unknown unit/format).
     """
+    wb = _build_workbook(plan)
+    filename: str = plan["workbook"]["filename"]
+
+    # Save workbook -----------------------------------------------------------------
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = (output_dir / filename).expanduser().resolve()
+    wb.save(output_path)
+    return output_path
+
+
+# ---------------------------------------------------------------------------
+# Workbook construction
+# ---------------------------------------------------------------------------
+
+
+def _build_workbook(plan: Dict[str, Any]) -> Workbook:
+    """Validate ``plan`` and lay it out in a new in-memory workbook.
+
+    Raises the same errors as :func:`build_from_plan`, which only adds saving.
+    The whole plan is validated before openpyxl is touched, so invalid plans
+    fail without building a workbook.
+    """
     _validate_plan_root(plan)
     workbook_spec = plan["workbook"]
     worksheet_spec = plan["worksheet"]
 
     filename: str = workbook_spec["filename"]
     _validate_filename(filename)
+    _validate_grid(worksheet_spec)
 
     wb = Workbook()
     ws = wb.active
     ws.title = worksheet_spec["name"]
 
-    # Track used rows/columns to validate collisions and formula bounds
-    used_labels_rows: set[int] = set()
-    used_headers_cols: set[int] = set()
-    max_data_row = 1
-    max_data_col = 1
-
     # Build columns
-    columns_spec: List[Dict[str, Any]] = worksheet_spec.get("columns", [])
-    if not isinstance(columns_spec, list) or not columns_spec:
-        raise SchemaError("'columns' must be a non-empty list")
-
-    for col_obj in columns_spec:
-        col_index = col_obj.get("col")
-        header = col_obj.get("header")
-        cells_spec = col_obj.get("cells")
-
-        if not isinstance(col_index, int):
-            raise SchemaError("Column index 'col' must be an integer")
-        if col_index < 2:
-            raise LayoutError("Data columns must start at column 2 (column B)")
-        if header is None:
-            raise SchemaError("Each column must include a 'header' field")
-        if not isinstance(cells_spec, list) or not cells_spec:
-            raise SchemaError("'cells' must be a non-empty list for each column")
-
-        # Write header (Row 1)
-        if ws.cell(row=1, column=col_index).value not in (None, ""):
-            raise LayoutError(
-                f"Header cell {get_column_letter(col_index)}1 already occupied"
-            )
-        ws.cell(row=1, column=col_index, value=header)
-        used_headers_cols.add(col_index)
-        max_data_col = max(max_data_col, col_index)
-
-        # Process cells
-        for cell_obj in cells_spec:
-            _write_cell(ws, col_index, cell_obj, used_labels_rows)
-            max_data_row = max(max_data_row, cell_obj["row"])
+    for col_obj in worksheet_spec["columns"]:
+        col_index = col_obj["col"]
+        ws.cell(row=1, column=col_index, value=col_obj["header"])
+        for cell_obj in col_obj["cells"]:
+            _write_cell(ws, col_index, cell_obj)
 
     # Named ranges -----------------------------------------------------------------
-    named_ranges_spec: List[Dict[str, Any]] = worksheet_spec.get("named_ranges", [])
-    for nr in named_ranges_spec:
-        _add_named_range(wb, ws, nr, max_data_row, max_data_col)
-
-    # Validate formulas now that we know bounds -------------------------------------
-    _validate_formulas(ws, max_data_row, max_data_col)
+    for nr in worksheet_spec.get("named_ranges", []):
+        dn = DefinedName(nr["name"], attr_text=f"'{ws.title}'!{nr['ref']}")
+        wb.defined_names.add(dn)
 
     # Patch openpyxl's iterator for DefinedNameDict so that iterating over
     # ``wb.defined_names`` yields the *objects* not the plain keys.  Some
@@ -155,15 +144,11 @@ def build_from_plan(
     except Exception:  # pragma: no cover – safeguard only
         pass
 
-    # Save workbook -----------------------------------------------------------------
-    output_dir.mkdir(parents=True, exist_ok=True)
-    output_path = (output_dir / filename).expanduser().resolve()
-    wb.save(output_path)
-    return output_path
+    return wb
 
 
 # ---------------------------------------------------------------------------
-# Validation / writing helpers
+# Validation helpers
 # ---------------------------------------------------------------------------
 
 
@@ -181,9 +166,66 @@ def _validate_filename(filename: str) -> None:
         raise SchemaError("Filename must not contain path separators")
 
 
-def _write_cell(
-    ws, col_index: int, cell_obj: Dict[str, Any], used_labels_rows: set[int]
-):
+def _validate_grid(worksheet_spec: Dict[str, Any]) -> None:
+    """Check columns, cells, named ranges and formulas against the plan alone."""
+    columns_spec: List[Dict[str, Any]] = worksheet_spec.get("columns", [])
+    if not isinstance(columns_spec, list) or not columns_spec:
+        raise SchemaError("'columns' must be a non-empty list")
+
+    # Track used headers/labels to validate collisions, and the data bounds
+    headers_cols: set[int] = set()
+    labels: Dict[int, Any] = {}
+    formulas: List[Tuple[str, str]] = []
+    max_data_row = 1
+    max_data_col = 1
+
+    for col_obj in columns_spec:
+        col_index = col_obj.get("col")
+        header = col_obj.get("header")
+        cells_spec = col_obj.get("cells")
+
+        if not isinstance(col_index, int):
+            raise SchemaError("Column index 'col' must be an integer")
+        if col_index < 2:
+            raise LayoutError("Data columns must start at column 2 (column B)")
+        if header is None:
+            raise SchemaError("Each column must include a 'header' field")
+        if not isinstance(cells_spec, list) or not cells_spec:
+            raise SchemaError("'cells' must be a non-empty list for each column")
+
+        # Header (Row 1)
+        if col_index in headers_cols:
+            raise LayoutError(
+                f"Header cell {get_column_letter(col_index)}1 already occupied"
+            )
+        if header != "":
+            headers_cols.add(col_index)
+        max_data_col = max(max_data_col, col_index)
+
+        for cell_obj in cells_spec:
+            _validate_cell(cell_obj)
+            row_index = cell_obj["row"]
+
+            # Label in column A (first write wins)
+            label = cell_obj["label"]
+            previous = labels.get(row_index)
+            if previous not in (None, "") and previous != label:
+                raise LayoutError(f"Label collision at A{row_index}")
+            labels[row_index] = label
+
+            if cell_obj["type"] == "calc":
+                coordinate = f"{get_column_letter(col_index)}{row_index}"
+                formulas.append((coordinate, cell_obj["formula"]))
+            max_data_row = max(max_data_row, row_index)
+
+    named_ranges_spec: List[Dict[str, Any]] = worksheet_spec.get("named_ranges", [])
+    for nr in named_ranges_spec:
+        _validate_named_range(nr, max_data_row, max_data_col)
+
+    _validate_formulas(formulas, max_data_row, max_data_col)
+
+
+def _validate_cell(cell_obj: Dict[str, Any]) -> None:
     # Basic schema validation -------------------------------------------------------
     if not isinstance(cell_obj, dict):
         raise SchemaError("Each cell specification must be a dictionary")
@@ -197,7 +239,6 @@ def _write_cell(
     if not isinstance(row_index, int) or row_index < 2:
         raise LayoutError("Data rows must start at row 2 (row index >=2)")
 
-    label = cell_obj["label"]
     cell_type = cell_obj["type"]
     unit = cell_obj["unit"]
 
@@ -206,30 +247,78 @@ def _write_cell(
     if unit not in _ALLOWED_UNITS:
         raise ValueError(f"Unknown unit '{unit}'")
 
-    # Handle label in column A (first write wins) ----------------------------------
-    label_cell = ws.cell(row=row_index, column=1)
-    if label_cell.value not in (None, "") and label_cell.value != label:
-        raise LayoutError(f"Label collision at A{row_index}")
-    label_cell.value = label
-    used_labels_rows.add(row_index)
-
-    # Write data or formula ---------------------------------------------------------
-    data_cell = ws.cell(row=row_index, column=col_index)
-
+    # Data or formula ---------------------------------------------------------------
     if cell_type == "calc":
         formula = cell_obj.get("formula")
         if formula is None or not isinstance(formula, str):
             raise SchemaError("Calculated cells must include a 'formula' string")
+    else:
+        if "value" not in cell_obj:
+            raise SchemaError("Non-calculated cells must include a 'value'")
+        if not isinstance(cell_obj["value"], (int, float)):
+            raise ValueError("'value' must be numeric for fact/assumption cells")
+
+    fmt_token = cell_obj.get("format")
+    if fmt_token and fmt_token not in _FORMAT_MAP:
+        raise ValueError(f"Unknown format token '{fmt_token}'")
+
+
+def _validate_named_range(nr_spec: Dict[str, Any], max_row: int, max_col: int) -> None:
+    name = nr_spec.get("name")
+    ref = nr_spec.get("ref")
+    if not name or not ref:
+        raise SchemaError("Each named_range must include 'name' and 'ref'")
+
+    # Check reference within sheet bounds
+    match = _CELL_REF_RE.fullmatch(ref)
+    if not match:
+        raise LayoutError(f"Named range ref '{ref}' is not a single cell reference")
+    col_letters, row_str = match.groups()
+    ref_col = column_index_from_string(col_letters)
+    ref_row = int(row_str)
+    if ref_col > max_col or ref_row > max_row or ref_col < 2 or ref_row < 2:
+        raise LayoutError(f"Named range reference '{ref}' out of data bounds")
+
+
+def _validate_formulas(
+    formulas: List[Tuple[str, str]], max_row: int, max_col: int
+) -> None:
+    """Validate that each ``(coordinate, formula)`` references cells inside the grid."""
+    for coordinate, formula in formulas:
+        for match in _CELL_REF_RE.finditer(formula):
+            col_letters, row_str = match.groups()
+            col_idx = column_index_from_string(col_letters)
+            row_idx = int(row_str)
+            if col_idx < 2 or row_idx < 2 or col_idx > max_col or row_idx > max_row:
+                raise FormulaError(
+                    f"Formula in {coordinate} references out-of-bounds cell "
+                    f"{col_letters}{row_str}"
+                )
+
+
+# ---------------------------------------------------------------------------
+# Writing helpers
+# ---------------------------------------------------------------------------
+
+
+def _write_cell(ws, col_index: int, cell_obj: Dict[str, Any]) -> None:
+    row_index = cell_obj["row"]
+    unit = cell_obj["unit"]
+
+    # Label in column A -------------------------------------------------------------
+    ws.cell(row=row_index, column=1, value=cell_obj["label"])
+
+    # Write data or formula ---------------------------------------------------------
+    data_cell = ws.cell(row=row_index, column=col_index)
+
+    if cell_obj["type"] == "calc":
+        formula = cell_obj["formula"]
         if not formula.startswith("="):
             warnings.warn("Formula missing '=' – auto-prepending.", stacklevel=2)
             formula = "=" + formula
         data_cell.value = formula
     else:
-        if "value" not in cell_obj:
-            raise SchemaError("Non-calculated cells must include a 'value'")
         value = cell_obj["value"]
-        if not isinstance(value, (int, float)):
-            raise ValueError("'value' must be numeric for fact/assumption cells")
         if round(value, 2) != value:
             warnings.warn(
                 "Value has more than two decimals – automatically rounding to 2dp",
@@ -241,8 +330,6 @@ def _write_cell(
     # Number format -----------------------------------------------------------------
     fmt_token = cell_obj.get("format")
     if fmt_token:
-        if fmt_token not in _FORMAT_MAP:
-            raise ValueError(f"Unknown format token '{fmt_token}'")
         data_cell.number_format = _FORMAT_MAP[fmt_token]
         # Warn if unit mismatch
         if unit == "percent" and not fmt_token.startswith("percent_"):
@@ -260,50 +347,3 @@ def _write_cell(
             warnings.warn(
                 "Percent unit provided without percent format token", stacklevel=2
             )
-
-
-def _add_named_range(
-    wb: Workbook,
-    ws,
-    nr_spec: Dict[str, Any],
-    max_row: int,
-    max_col: int,
-):
-    name = nr_spec.get("name")
-    ref = nr_spec.get("ref")
-    if not name or not ref:
-        raise SchemaError("Each named_range must include 'name' and 'ref'")
-
-    # Check reference within sheet bounds
-    match = _CELL_REF_RE.fullmatch(ref)
-    if not match:
-        raise LayoutError(f"Named range ref '{ref}' is not a single cell reference")
-    col_letters, row_str = match.groups()
-    ref_col = column_index_from_string(col_letters)
-    ref_row = int(row_str)
-    if ref_col > max_col or ref_row > max_row or ref_col < 2 or ref_row < 2:
-        raise LayoutError(f"Named range reference '{ref}' out of data bounds")
-
-    dn = DefinedName(name, attr_text=f"'{ws.title}'!{ref}")
-    wb.defined_names.add(dn)
-
-
-def _validate_formulas(ws, max_row: int, max_col: int) -> None:
-    """Validate that each formula references cells inside the allowed grid."""
-    for row in ws.iter_rows(min_row=2, min_col=2, max_row=max_row, max_col=max_col):
-        for cell in row:
-            if isinstance(cell.value, str) and cell.value.startswith("="):
-                formula = cell.value
-                for col_letters, row_str in _CELL_REF_RE.findall(formula):
-                    col_idx = column_index_from_string(col_letters)
-                    row_idx = int(row_str)
-                    if (
-                        col_idx < 2
-                        or row_idx < 2
-                        or col_idx > max_col
-                        or row_idx > max_row
-                    ):
-                        raise FormulaError(
-                            f"Formula in {cell.coordinate} references out-of-bounds cell "
-                            f"{col_letters}{row_str}"
-                        )
@@ -3,7 +3,11 @@ Pytest configuration and fixtures for FastAPI template tests.
 """
 
 import os
+from types import SimpleNamespace
+
+import httpx
 import pytest
+import pytest_asyncio
 
 # Set test environment variables
 os.environ["ARCHON_API_KEY"] = "test-api-key"
@@ -11,37 +15,105 @@ os.environ["LANGFLOW_SERVER_URL"] = "http://test-server:7860/api/v1/run/"
 os.environ["LANGFLOW_API_KEY"] = "test-langflow-key"
 os.environ["OPENAI_API_KEY"] = "test-openai-key"
 
+# Import the app (FastAPI, Starlette, Pydantic, LangChain…) once at session
+# start, after the env is set, so the cost is not billed to the first test.
+from fastapi.testclient import TestClient  # noqa: E402
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+
+from src import api  # noqa: E402
+from src.api import app, get_http_client  # noqa: E402
+
+# What ``get_setting`` returns while the ``settings`` fixture is active.
+SETTINGS = {
+    "ARCHON_API_KEY": "test-key",
+    "LANGFLOW_API_KEY": "test-api-key",
+    "LANGFLOW_SERVER_URL": "http://test-server:7860/api/v1/run/",
+}
+
 
 @pytest.fixture
+def settings(monkeypatch):
+    """Serve ``get_setting`` from ``SETTINGS`` instead of env/Secret Manager."""
+    monkeypatch.setattr(api, "get_setting", SETTINGS.get)
+    return SETTINGS
+
+
+@pytest.fixture(scope="session")
 def test_client():
-    """Create a test client for the FastAPI app."""
-    from fastapi.testclient import TestClient
-    from src.api import app
+    """
+    Test client shared across the session, so app startup runs once.
 
-    return TestClient(app)
+    Tests must not mutate app state through it.
+    """
+    with TestClient(app) as client:
+        yield client
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def openapi_schema():
+    """The app's OpenAPI schema, read straight from the app without an HTTP round trip."""
+    return app.openapi()
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def async_client():
+    """
+    Async client sharing one ASGI transport for the whole session.
+
+    Sends ``SETTINGS["ARCHON_API_KEY"]`` by default, which is accepted while
+    the ``settings`` fixture is active; tests using it need
+    ``@pytest.mark.asyncio(loop_scope="session")``.
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app, raise_app_exceptions=False),
+        base_url="http://testserver",
+        timeout=None,
+        headers={"X-API-Key": SETTINGS["ARCHON_API_KEY"]},
+    ) as client:
+        yield client
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def langflow_server():
+    """
+    Serve LangFlow calls from a real ``httpx.AsyncClient`` over ``MockTransport``.
+
+    Tests set ``response`` to the ``httpx.Response`` LangFlow should return;
+    every request the endpoint sends is recorded in ``requests``.
+    """
+    server = SimpleNamespace(response=httpx.Response(200, json={}), requests=[])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        server.requests.append(request)
+        return server.response
+
+    async with AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        app.dependency_overrides[get_http_client] = lambda: client
+        yield server
+        app.dependency_overrides.pop(get_http_client, None)
+
+
+@pytest.fixture(scope="session")
 def sample_research_request():
-    """Sample research request data."""
+    """Sample research request data (shared across the session; do not mutate)."""
     return {
         "query": "Explain quantum computing in simple terms.",
         "flow_id": "af41bf0f-6ffb-4591-a276-8ae5f296da51",
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_spreadsheet_request():
-    """Sample spreadsheet request data."""
+    """Sample spreadsheet request data (shared across the session; do not mutate)."""
     return {
         "objective": "Model FY-2024 revenue break-even analysis",
         "data": "Revenue: 763.9M, Fixed Costs: 45M, Variable Cost %: 12%",
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_langflow_response():
-    """Mock LangFlow response structure."""
+    """Mock LangFlow response structure (shared across the session; do not mutate)."""
     return {
         "session_id": "test-session",
         "outputs": [
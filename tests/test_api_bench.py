@@ -0,0 +1,44 @@
+"""Request-path benchmarks for the JSON endpoints.
+
+Deselected by default; run with ``pytest -m benchmark``.
+"""
+
+import httpx
+import pytest
+
+HEADERS = {"X-API-Key": "test-key"}
+
+
+@pytest.mark.benchmark(group="api")
+class TestApiBenchmarks:
+    """Benchmarks for the health and research request paths."""
+
+    def test_health_perf(self, benchmark, test_client):
+        """Benchmark GET /health."""
+        response = benchmark.pedantic(
+            test_client.get, args=("/health",), rounds=50, warmup_rounds=5, iterations=1
+        )
+        assert response.status_code == 200
+
+    def test_research_perf(
+        self,
+        settings,
+        langflow_server,
+        benchmark,
+        test_client,
+        sample_research_request,
+        mock_langflow_response,
+    ):
+        """Benchmark POST /research with LangFlow mocked out."""
+        langflow_server.response = httpx.Response(200, json=mock_langflow_response)
+
+        response = benchmark.pedantic(
+            test_client.post,
+            args=("/research",),
+            kwargs={"json": sample_research_request, "headers": HEADERS},
+            rounds=50,
+            warmup_rounds=5,
+            iterations=1,
+        )
+
+        assert response.status_code == 200
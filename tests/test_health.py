@@ -0,0 +1,42 @@
+"""Tests for the health endpoint and app startup."""
+
+from datetime import datetime
+
+import httpx
+import pytest
+
+from src.api import HealthResponse, app, health_check
+
+
+class TestHealthEndpoint:
+    """Test cases for the health endpoint."""
+
+    def test_health_check_handler(self):
+        """Call the handler directly, skipping routing and the JSON round-trip."""
+        result = health_check()
+
+        assert result.status_code == 200
+        health = HealthResponse.model_validate_json(result.body)
+        assert health.status == "healthy"
+        assert health.version == "1.0.0"
+        datetime.fromisoformat(health.timestamp)
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_health_endpoint(self, async_client):
+        """Test the /health route end-to-end."""
+        response = await async_client.get("/health")
+
+        assert response.status_code == 200
+        # The handler skips validation, so check the payload against the schema
+        health = HealthResponse.model_validate_json(response.content)
+        assert health.status == "healthy"
+
+
+class TestAppLifespan:
+    """Test cases for resources the app sets up at startup."""
+
+    def test_lifespan_opens_shared_http_client(self, test_client):
+        """Test the app opens one pooled client for LangFlow calls at startup."""
+        client = app.state.http_client
+        assert isinstance(client, httpx.AsyncClient)
+        assert not client.is_closed
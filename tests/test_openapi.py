@@ -0,0 +1,42 @@
+"""Tests for the generated OpenAPI schema."""
+
+import orjson
+import pytest
+
+
+class TestOpenAPISchema:
+    """Test cases for the OpenAPI schema."""
+
+    def test_openapi_route_serves_schema(self, test_client, openapi_schema):
+        """Test /openapi.json serves the schema the other tests read directly."""
+        response = test_client.get("/openapi.json")
+        assert response.status_code == 200
+        assert orjson.loads(response.content) == openapi_schema
+
+    @pytest.mark.parametrize(
+        "path, method",
+        [
+            ("/health", "get"),
+            ("/research", "post"),
+            ("/vid-reasoner", "post"),
+            ("/spreadsheet/build", "post"),
+            ("/spreadsheet/plan", "post"),
+        ],
+    )
+    def test_endpoint_documented(self, openapi_schema, path, method):
+        """Test each public endpoint appears in the schema."""
+        assert method in openapi_schema["paths"][path]
+
+    @pytest.mark.parametrize(
+        "path, method, model",
+        [
+            ("/health", "get", "HealthResponse"),
+            ("/research", "post", "ResearchResponse"),
+            ("/vid-reasoner", "post", "ResearchResponse"),
+        ],
+    )
+    def test_response_model_documented(self, openapi_schema, path, method, model):
+        """Test endpoints returning PydanticResponse still document their model."""
+        content = openapi_schema["paths"][path][method]["responses"]["200"]["content"]
+        schema = content["application/json"]["schema"]
+        assert schema["$ref"] == f"#/components/schemas/{model}"
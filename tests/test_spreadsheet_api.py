@@ -1,155 +1,171 @@
 """Tests for the spreadsheet API endpoints."""
 
 import pytest
-import tempfile
-import os
-from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
-from pathlib import Path
+import orjson
+from unittest.mock import patch
 
-from src.api import app
+from src import api
 
-client = TestClient(app)
 
+class _StubPlanGenerator:
+    """Stand-in for ``PlanGenerator`` without MagicMock's call bookkeeping."""
 
-class TestSpreadsheetEndpoints:
-    """Test cases for spreadsheet endpoints."""
+    __slots__ = ("plan", "error", "calls")
 
-    @patch("src.api.PlanGenerator")
-    @patch("src.api.build_from_plan")
-    @patch("src.api.get_setting")
-    def test_generate_spreadsheet_success(
-        self, mock_get_setting, mock_build, mock_generator_class
-    ):
-        """Test successful spreadsheet generation."""
-        # Mock the plan generator
-        mock_generator = MagicMock()
-        mock_generator_class.return_value = mock_generator
-        mock_generator.generate.return_value = {"workbook": {"filename": "test.xlsx"}}
+    def __init__(self):
+        self.plan = None
+        self.error = None
+        self.calls = []
 
-        # Mock the API key setting
-        mock_get_setting.return_value = "test-key"
+    def __call__(self):
+        # The endpoints call ``_plan_generator()``; hand back this same stub.
+        return self
 
-        # Create a temporary file that actually exists
-        with tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False) as tmp_file:
-            tmp_file.write(b"fake excel content")
-            tmp_file_path = tmp_file.name
+    def generate(self, objective, data):
+        self.calls.append((objective, data))
+        if self.error is not None:
+            raise self.error
+        return self.plan
 
-        # Mock the build function to return the actual file path
-        mock_build.return_value = Path(tmp_file_path)
 
-        try:
-            response = client.post(
-                "/spreadsheet/build",
-                json={"objective": "Model FY-2024 revenue", "data": "Revenue: 100M"},
-                headers={"X-API-Key": "test-key"},
-            )
-
-            assert response.status_code == 200
-            assert (
-                response.headers["content-type"]
-                == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-        finally:
-            # Clean up the temporary file
-            if os.path.exists(tmp_file_path):
-                os.unlink(tmp_file_path)
-
-    @patch("src.api.PlanGenerator")
-    @patch("src.api.get_setting")
-    def test_generate_spreadsheet_missing_api_key(
-        self, mock_get_setting, mock_generator_class
+@pytest.fixture
+def plan_generator(monkeypatch):
+    """Replace the cached ``PlanGenerator`` factory with a fresh stub."""
+    stub = _StubPlanGenerator()
+    monkeypatch.setattr(api, "_plan_generator", stub)
+    return stub
+
+
+pytestmark = pytest.mark.usefixtures("settings")
+
+
+class TestSpreadsheetEndpoints:
+    """Test cases for spreadsheet endpoints."""
+
+    @patch.object(api, "build_from_plan")
+    def test_generate_spreadsheet_success(
+        self, mock_build, plan_generator, test_client, tmp_path
     ):
-        """Test spreadsheet generation with missing OpenAI API key."""
-        # Mock the generator to raise RuntimeError (missing API key)
-        mock_generator = MagicMock()
-        mock_generator_class.return_value = mock_generator
-        mock_generator.generate.side_effect = RuntimeError("OPENAI_API_KEY is required")
+        """Test successful spreadsheet generation."""
+        # Stub the plan generator
+        plan_generator.plan = {"workbook": {"filename": "test.xlsx"}}
 
-        # Mock the API key setting
-        mock_get_setting.return_value = "test-key"
+        # Point the mocked build at a file that actually exists
+        xlsx_path = tmp_path / "fake.xlsx"
+        xlsx_path.write_bytes(b"fake excel content")
+        mock_build.return_value = xlsx_path
 
-        response = client.post(
+        response = test_client.post(
             "/spreadsheet/build",
             json={"objective": "Model FY-2024 revenue", "data": "Revenue: 100M"},
             headers={"X-API-Key": "test-key"},
         )
 
-        assert response.status_code == 503
-        assert "OPENAI_API_KEY is required" in response.json()["detail"]
+        assert response.status_code == 200
+        assert (
+            response.headers["content-type"]
+            == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
 
-    @patch("src.api.PlanGenerator")
-    @patch("src.api.get_setting")
-    def test_generate_plan_success(self, mock_get_setting, mock_generator_class):
+    def test_generate_plan_success(self, plan_generator, test_client):
         """Test successful plan generation."""
-        # Mock the plan generator
-        mock_generator = MagicMock()
-        mock_generator_class.return_value = mock_generator
+        # Stub the plan generator
         expected_plan = {
             "workbook": {"filename": "test.xlsx"},
             "worksheet": {"name": "Model", "columns": []},
         }
-        mock_generator.generate.return_value = expected_plan
-
-        # Mock the API key setting
-        mock_get_setting.return_value = "test-key"
+        plan_generator.plan = expected_plan
 
-        response = client.post(
+        response = test_client.post(
             "/spreadsheet/plan",
             json={"objective": "Model FY-2024 revenue", "data": "Revenue: 100M"},
             headers={"X-API-Key": "test-key"},
         )
 
         assert response.status_code == 200
-        assert response.json() == expected_plan
+        assert orjson.loads(response.content) == expected_plan
+        assert plan_generator.calls == [("Model FY-2024 revenue", "Revenue: 100M")]
 
-    @patch("src.api.PlanGenerator")
-    @patch("src.api.get_setting")
-    def test_generate_plan_missing_api_key(
-        self, mock_get_setting, mock_generator_class
+    @pytest.mark.parametrize(
+        "path, exc, status_code, detail",
+        [
+            (
+                "/spreadsheet/build",
+                RuntimeError("OPENAI_API_KEY is required"),
+                503,
+                b"OPENAI_API_KEY is required",
+            ),
+            (
+                "/spreadsheet/plan",
+                RuntimeError("OPENAI_API_KEY is required"),
+                503,
+                b"OPENAI_API_KEY is required",
+            ),
+            (
+                "/spreadsheet/build",
+                ValueError("bad plan"),
+                500,
+                b"Error generating plan: bad plan",
+            ),
+            (
+                "/spreadsheet/plan",
+                ValueError("bad plan"),
+                500,
+                b"Error generating plan: bad plan",
+            ),
+        ],
+    )
+    def test_plan_generation_errors(
+        self,
+        plan_generator,
+        test_client,
+        path,
+        exc,
+        status_code,
+        detail,
     ):
-        """Test plan generation with missing OpenAI API key."""
-        # Mock the generator to raise RuntimeError (missing API key)
-        mock_generator = MagicMock()
-        mock_generator_class.return_value = mock_generator
-        mock_generator.generate.side_effect = RuntimeError("OPENAI_API_KEY is required")
-
-        # Mock the API key setting
-        mock_get_setting.return_value = "test-key"
+        """Test plan generation failures map to the right status code."""
+        # Make the generator raise (RuntimeError → missing API key, else 500)
+        plan_generator.error = exc
 
-        response = client.post(
-            "/spreadsheet/plan",
+        response = test_client.post(
+            path,
             json={"objective": "Model FY-2024 revenue", "data": "Revenue: 100M"},
             headers={"X-API-Key": "test-key"},
         )
 
-        assert response.status_code == 503
-        assert "OPENAI_API_KEY is required" in response.json()["detail"]
+        assert response.status_code == status_code
+        assert detail in response.content
 
-    def test_spreadsheet_endpoint_invalid_request(self):
-        """Test spreadsheet endpoint with invalid request body."""
-        response = client.post(
-            "/spreadsheet/build",
+    @pytest.mark.parametrize("path", ["/spreadsheet/build", "/spreadsheet/plan"])
+    def test_spreadsheet_endpoint_invalid_request(self, test_client, path):
+        """Test spreadsheet endpoints with invalid request body."""
+        response = test_client.post(
+            path,
             json={
                 # Missing objective
                 "data": "Revenue: 100M"
             },
             headers={"X-API-Key": "test-key"},
         )
-        assert (
-            response.status_code == 401
-        )  # Unauthorized due to missing or invalid API key
+        assert response.status_code == 422  # Validation error
 
-    def test_plan_endpoint_invalid_request(self):
-        """Test plan endpoint with invalid request body."""
-        response = client.post(
-            "/spreadsheet/plan",
-            json={
-                # Missing objective
-                "data": "Revenue: 100M"
-            },
-            headers={"X-API-Key": "test-key"},
+    @pytest.mark.parametrize("path", ["/spreadsheet/build", "/spreadsheet/plan"])
+    def test_spreadsheet_endpoint_invalid_api_key(self, test_client, path):
+        """Test spreadsheet endpoints reject a wrong API key."""
+        response = test_client.post(
+            path,
+            json={"objective": "Model FY-2024 revenue", "data": "Revenue: 100M"},
+            headers={"X-API-Key": "wrong-key"},
         )
-        assert (
-            response.status_code == 401
-        )  # Unauthorized due to missing or invalid API key
+        assert response.status_code == 401
+        assert b"Invalid API key" in response.content
+
+    def test_plan_generator_is_cached(self, monkeypatch):
+        """The endpoints reuse a single PlanGenerator instance."""
+        monkeypatch.setattr(api, "PlanGenerator", object)
+        api._plan_generator.cache_clear()
+        try:
+            assert api._plan_generator() is api._plan_generator()
+        finally:
+            api._plan_generator.cache_clear()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-import json
+import copy
+import io
 import warnings
 from pathlib import Path
 from typing import Dict, Any
@@ -8,7 +9,9 @@ from typing import Dict, Any
 import pytest
 from openpyxl import load_workbook
 
+from src.spreadsheet_builder import builder
 from src.spreadsheet_builder.builder import (
+    _build_workbook,
     build_from_plan,
     SchemaError,
     LayoutError,
@@ -16,51 +19,78 @@ from src.spreadsheet_builder.builder import (
 )
 
 
+# Valid build-plan matching the README example, allocated once at import.
+# Never mutate it: tests that tweak the plan take ``sample_plan`` (a deep copy),
+# read-only callers take ``sample_plan_ro``.
+SAMPLE_PLAN: Dict[str, Any] = {
+    "workbook": {"filename": "innv_model.xlsx"},
+    "worksheet": {
+        "name": "Model",
+        "columns": [
+            {
+                "col": 2,
+                "header": "FY-2024",
+                "cells": [
+                    {
+                        "row": 2,
+                        "label": "Revenue",
+                        "type": "fact",
+                        "unit": "dollars",
+                        "value": 763900000,
+                        "format": "currency_0dp",
+                    },
+                    {
+                        "row": 3,
+                        "label": "Participants",
+                        "type": "fact",
+                        "unit": "vanilla",
+                        "value": 7020,
+                        "format": "comma_0dp",
+                    },
+                    {
+                        "row": 4,
+                        "label": "Revenue per Participant",
+                        "type": "calc",
+                        "unit": "dollars",
+                        "formula": "=B2/B3",
+                        "format": "currency_2dp",
+                    },
+                ],
+            }
+        ],
+        "named_ranges": [
+            {"name": "Revenue", "ref": "B2"},
+            {"name": "Participants", "ref": "B3"},
+        ],
+    },
+}
+
+
 @pytest.fixture()
 def sample_plan() -> Dict[str, Any]:
-    """Return a valid build-plan matching the README example."""
-    return {
-        "workbook": {"filename": "innv_model.xlsx"},
-        "worksheet": {
-            "name": "Model",
-            "columns": [
-                {
-                    "col": 2,
-                    "header": "FY-2024",
-                    "cells": [
-                        {
-                            "row": 2,
-                            "label": "Revenue",
-                            "type": "fact",
-                            "unit": "dollars",
-                            "value": 763900000,
-                            "format": "currency_0dp",
-                        },
-                        {
-                            "row": 3,
-                            "label": "Participants",
-                            "type": "fact",
-                            "unit": "vanilla",
-                            "value": 7020,
-                            "format": "comma_0dp",
-                        },
-                        {
-                            "row": 4,
-                            "label": "Revenue per Participant",
-                            "type": "calc",
-                            "unit": "dollars",
-                            "formula": "=B2/B3",
-                            "format": "currency_2dp",
-                        },
-                    ],
-                }
-            ],
-            "named_ranges": [
-                {"name": "Revenue", "ref": "B2"},
-                {"name": "Participants", "ref": "B3"},
-            ],
-        },
-    }
+    """Return a private, mutable copy of ``SAMPLE_PLAN``."""
+    return copy.deepcopy(SAMPLE_PLAN)
+
+
+@pytest.fixture()
+def sink() -> io.BytesIO:
+    """In-memory target so builds never touch the filesystem."""
+    return io.BytesIO()
+
+
+@pytest.fixture(scope="session")
+def sample_plan_ro() -> Dict[str, Any]:
+    """Return ``SAMPLE_PLAN`` itself, skipping the copy; callers must not mutate it.
+
+    ``build_from_plan`` only reads the plan, so it can be handed this directly.
+    """
+    return SAMPLE_PLAN
+
+
+@pytest.fixture(scope="session")
+def built_valid_workbook(tmp_path_factory, sample_plan_ro) -> Path:
+    """Build ``SAMPLE_PLAN`` once per session; for read-only assertions."""
+    return build_from_plan(sample_plan_ro, output_dir=tmp_path_factory.mktemp("wb"))
 
 
 # ---------------------------------------------------------------------------
@@ -68,11 +98,12 @@ def sample_plan() -> Dict[str, Any]:
 # ---------------------------------------------------------------------------
 
 
-def test_build_valid_plan(tmp_path: Path, sample_plan: Dict[str, Any]):
-    output_path = build_from_plan(sample_plan, output_dir=tmp_path)
+def test_build_valid_plan(built_valid_workbook: Path):
+    output_path = built_valid_workbook
     assert output_path.exists(), "Workbook file should be written"
 
-    wb = load_workbook(output_path, data_only=False)
+    # read_only streams the sheet XML instead of materialising every cell/style
+    wb = load_workbook(output_path, read_only=True)
     ws = wb["Model"]
 
     # Headers
@@ -92,76 +123,105 @@ def test_build_valid_plan(tmp_path: Path, sample_plan: Dict[str, Any]):
     dn_dict = {dn.name: dn.attr_text for dn in wb.defined_names}
     assert dn_dict["Revenue"].endswith("!B2")
     assert dn_dict["Participants"].endswith("!B3")
+    wb.close()
 
 
-# ---------------------------------------------------------------------------
-# Filename & path validation
-# ---------------------------------------------------------------------------
-
+def test_built_workbook_saves_to_stream(sample_plan_ro, sink):
+    # In-memory callers save the workbook themselves instead of going to disk
+    _build_workbook(sample_plan_ro).save(sink)
 
-def test_invalid_filename_extension(sample_plan):
-    sample_plan["workbook"]["filename"] = "model.xls"  # missing xlsx
-    with pytest.raises(SchemaError):
-        build_from_plan(sample_plan, output_dir=Path("/tmp"))
+    wb = load_workbook(sink, read_only=True)
+    assert wb["Model"]["B1"].value == "FY-2024"
+    wb.close()
 
 
-def test_filename_with_path_separator(sample_plan):
-    sample_plan["workbook"]["filename"] = "../model.xlsx"
-    with pytest.raises(SchemaError):
-        build_from_plan(sample_plan, output_dir=Path("/tmp"))
+def test_build_does_not_mutate_plan(sample_plan):
+    # ``sample_plan_ro`` relies on the builder treating the plan as read-only
+    snapshot = copy.deepcopy(sample_plan)
+    _build_workbook(sample_plan)
+    assert sample_plan == snapshot
 
 
 # ---------------------------------------------------------------------------
-# Grid layout validation
+# Plan validation
 # ---------------------------------------------------------------------------
 
 
-def test_column_index_less_than_two(sample_plan):
-    sample_plan["worksheet"]["columns"][0]["col"] = 1
-    with pytest.raises(LayoutError):
-        build_from_plan(sample_plan, output_dir=Path("/tmp"))
-
-
-def test_row_index_less_than_two(sample_plan):
-    sample_plan["worksheet"]["columns"][0]["cells"][0]["row"] = 1
-    with pytest.raises(LayoutError):
-        build_from_plan(sample_plan, output_dir=Path("/tmp"))
-
-
-def test_named_range_out_of_bounds(sample_plan):
-    sample_plan["worksheet"]["named_ranges"][0]["ref"] = "Z100"
-    with pytest.raises(LayoutError):
-        build_from_plan(sample_plan, output_dir=Path("/tmp"))
+def _set(*path, value):
+    """Return a mutator that assigns ``value`` at ``path`` inside the plan."""
+
+    def mutate(plan):
+        target = plan
+        for key in path[:-1]:
+            target = target[key]
+        target[path[-1]] = value
+
+    return mutate
+
+
+FIRST_COLUMN = ("worksheet", "columns", 0)
+FIRST_CELL = (*FIRST_COLUMN, "cells", 0)
+
+
+@pytest.mark.parametrize(
+    "mutator, exc",
+    [
+        pytest.param(
+            _set("workbook", "filename", value="model.xls"),
+            SchemaError,
+            id="filename-extension",
+        ),
+        pytest.param(
+            _set("workbook", "filename", value="../model.xlsx"),
+            SchemaError,
+            id="filename-path-separator",
+        ),
+        pytest.param(
+            _set(*FIRST_COLUMN, "col", value=1),
+            LayoutError,
+            id="column-index-below-two",
+        ),
+        pytest.param(
+            _set(*FIRST_CELL, "row", value=1), LayoutError, id="row-index-below-two"
+        ),
+        pytest.param(
+            _set("worksheet", "named_ranges", 0, "ref", value="Z100"),
+            LayoutError,
+            id="named-range-out-of-bounds",
+        ),
+        pytest.param(
+            _set(*FIRST_CELL, "unit", value="euros"), ValueError, id="unknown-unit"
+        ),
+        pytest.param(
+            lambda plan: plan["worksheet"]["columns"][0]["cells"][0].pop("value"),
+            SchemaError,
+            id="fact-missing-value",
+        ),
+        pytest.param(
+            _set(*FIRST_COLUMN, "cells", 2, "formula", value="=Z100"),
+            FormulaError,
+            id="formula-out-of-bounds",
+        ),
+    ],
+)
+def test_builder_rejects(sample_plan, mutator, exc):
+    mutator(sample_plan)
+    with pytest.raises(exc):
+        _build_workbook(sample_plan)
 
 
-# ---------------------------------------------------------------------------
-# Value & type validation
-# ---------------------------------------------------------------------------
+def test_invalid_plan_fails_before_workbook(sample_plan, monkeypatch):
+    # Validation runs on the plan alone, so openpyxl is never reached
+    monkeypatch.setattr(builder, "Workbook", None)
+    sample_plan["worksheet"]["columns"][0]["cells"][2]["formula"] = "=Z100"
+    with pytest.raises(FormulaError):
+        _build_workbook(sample_plan)
 
 
 def test_value_more_than_two_decimals(sample_plan):
     sample_plan["worksheet"]["columns"][0]["cells"][0]["value"] = 123.456
-    path = build_from_plan(sample_plan, output_dir=Path("/tmp"))
-    wb = load_workbook(path)
-    assert wb.active["B2"].value == 123.46  # rounded to 2dp
-
-
-def test_unknown_unit(sample_plan):
-    sample_plan["worksheet"]["columns"][0]["cells"][0]["unit"] = "euros"
-    with pytest.raises(ValueError):
-        build_from_plan(sample_plan, output_dir=Path("/tmp"))
-
-
-def test_type_fact_missing_value(sample_plan):
-    # Remove 'value' field
-    sample_plan["worksheet"]["columns"][0]["cells"][0].pop("value")
-    with pytest.raises(SchemaError):
-        build_from_plan(sample_plan, output_dir=Path("/tmp"))
-
-
-# ---------------------------------------------------------------------------
-# Formula validation
-# ---------------------------------------------------------------------------
+    wb = _build_workbook(sample_plan)
+    assert wb["Model"]["B2"].value == 123.46  # rounded to 2dp
 
 
 # noqa: D401 – intentional xfail for auto-prepend behaviour
@@ -170,14 +230,7 @@ def test_formula_missing_equals(sample_plan):
     cell = sample_plan["worksheet"]["columns"][0]["cells"][2]
     cell["formula"] = "B2/B3"  # missing '='
     with pytest.raises(FormulaError):
-        build_from_plan(sample_plan, output_dir=Path("/tmp"))
-
-
-def test_formula_out_of_bounds_reference(sample_plan):
-    cell = sample_plan["worksheet"]["columns"][0]["cells"][2]
-    cell["formula"] = "=Z100"  # reference out of grid
-    with pytest.raises(FormulaError):
-        build_from_plan(sample_plan, output_dir=Path("/tmp"))
+        _build_workbook(sample_plan)
 
 
 # ---------------------------------------------------------------------------
@@ -191,7 +244,7 @@ def test_percent_unit_without_percent_format_warns(sample_plan):
     cell["unit"] = "percent"
     with warnings.catch_warnings(record=True) as w:
         warnings.simplefilter("always")
-        build_from_plan(sample_plan, output_dir=Path("/tmp"))
+        _build_workbook(sample_plan)
         assert any("percent" in str(warn.message).lower() for warn in w)
 
 
@@ -203,6 +256,5 @@ def test_percent_unit_without_percent_format_warns(sample_plan):
 def test_formula_auto_prepend(sample_plan):
     cell = sample_plan["worksheet"]["columns"][0]["cells"][2]
     cell["formula"] = "B2/B3"  # missing '='
-    path = build_from_plan(sample_plan, output_dir=Path("/tmp"))
-    wb = load_workbook(path, data_only=False)
-    assert wb.active["B4"].value == "=B2/B3"
+    wb = _build_workbook(sample_plan)
+    assert wb["Model"]["B4"].value == "=B2/B3"